@@ -3,23 +3,231 @@ Contract Generator - Backend System
 Sistema de generación automática de contratos legales colombianos
 """
 
+import io
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from num2words import num2words
 
+# Precalentar el conversor en español para que el primer contrato no pague el arranque
+num2words(1000000, lang='es')
+
+try:
+    # Opcional: búsqueda multi-literal en tiempo lineal (pyahocorasick)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Patrones precompilados de la plantilla (se usan en cada generación)
+_RE_DOMICILIO_CONTRATANTE = re.compile(r'domicilio principal en el municipio de La Estrella, Antioquia')
+_RE_DOMICILIO_CONTRATISTA = re.compile(r'con domicilio en el municipio de\s+Sabaneta')
+_RE_DIRECCION = re.compile(r'dirección: carera 40 # 71 sur-15')
+_RE_FECHA = re.compile(r'Sabaneta, Antioquia a los siete \(14\) días del mes de enero')
+_RE_CLAUSE = re.compile(
+    r'^(PRIMERA|SEGUNDA|TERCERA|CUARTA|QUINTA|SEXTA|SÉPTIMA|OCTAVA|NOVENA|DECIMA|DÉCIMA)',
+    re.IGNORECASE
+)
+_SIGNATURE_LINES = frozenset({'EL CONTRATANTE', 'EL CONTRATISTA', '.'})
+
+# Tipos de línea del contenido procesado (usados al armar el PDF)
+_LINE_TITLE = 'TITLE'
+_LINE_CLAUSULAS = 'CLAUSULAS'
+_LINE_CLAUSE = 'CLAUSE'
+_LINE_PARAGRAFO = 'PARAGRAFO'
+_LINE_SIGNATURE = 'SIGNATURE'
+_LINE_BODY = 'BODY'
+_LINE_EMPTY = 'EMPTY'
+
+# Iniciales de las cláusulas ordinales (PRIMERA, SEGUNDA, ...) y prefijos por primer carácter
+_CLAUSE_INITIALS = frozenset('PSTCQOND')
+_PREFIX_KIND = {
+    'E': ('EDISÓN', _LINE_SIGNATURE),
+    'G': ('GERMÁN', _LINE_SIGNATURE),
+    'C': ('CC ', _LINE_SIGNATURE),
+    'P': ('PARÁGRAFO', _LINE_PARAGRAFO),
+}
+
+# Estilo de la tabla de firmas (estático, compartido por todos los contratos)
+_FIRMA_TABLE_STYLE = TableStyle([
+    # Líneas de firma reales (sobre la fila de nombres)
+    ('LINEABOVE', (0, 1), (0, 1), 1.5, colors.black),
+    ('LINEABOVE', (1, 1), (1, 1), 1.5, colors.black),
+
+    # Alineación
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+
+    # Fuentes - Nombres
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, 1), 10),
+    ('TEXTCOLOR', (0, 1), (-1, 1), colors.black),
+
+    # Fuentes - CC
+    ('FONTNAME', (0, 2), (-1, 2), 'Helvetica'),
+    ('FONTSIZE', (0, 2), (-1, 2), 9),
+    ('TEXTCOLOR', (0, 2), (-1, 2), colors.black),
+
+    # Espaciado (la primera fila deja el espacio para firmar)
+    ('TOPPADDING', (0, 0), (-1, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 20),
+    ('TOPPADDING', (0, 1), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+])
+
+
+def _splice(text: str, start_anchor: str, end_anchor: str, replacement: str,
+            consume_end: bool = True) -> str:
+    """
+    Reemplaza cada tramo entre start_anchor y end_anchor (sin solaparse) por replacement
+    Equivale a re.sub con '.*?' y re.DOTALL, pero usando solo str.find
+    Si consume_end es False, el ancla final se conserva en el texto
+    """
+    parts = []
+    pos = 0
+    while True:
+        i = text.find(start_anchor, pos)
+        if i == -1:
+            break
+        j = text.find(end_anchor, i + len(start_anchor))
+        if j == -1:
+            break
+        parts.append(text[pos:i])
+        parts.append(replacement)
+        pos = j + len(end_anchor) if consume_end else j
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _automaton_replacer(keys: Tuple[str, ...]):
+    """
+    Construye replace(text, table) con un autómata Aho-Corasick (pyahocorasick)
+    Entre las coincidencias que se solapan elige la más a la izquierda y, en empate,
+    la más larga, igual que la alternancia de _regex_replacer
+    """
+    automaton = ahocorasick.Automaton()
+    for key in keys:
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+    
+    def replace(text: str, table: Dict[str, str]) -> str:
+        # iter() reporta todas las coincidencias (también solapadas) por posición final
+        matches = sorted(
+            ((end - len(key) + 1, -len(key), key) for end, key in automaton.iter(text))
+        )
+        parts = []
+        last = 0
+        for start, _, key in matches:
+            if start < last:
+                continue
+            parts.append(text[last:start])
+            parts.append(table[key])
+            last = start + len(key)
+        parts.append(text[last:])
+        return ''.join(parts)
+    
+    return replace
+
+
+def _regex_replacer(keys: Tuple[str, ...]):
+    """Construye replace(text, table) con una alternancia de regex, claves más largas primero"""
+    pattern = re.compile('|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True)))
+    
+    def replace(text: str, table: Dict[str, str]) -> str:
+        return pattern.sub(lambda m: table[m.group(0)], text)
+    
+    return replace
+
+
+@lru_cache(maxsize=32)
+def _literal_replacer(keys: Tuple[str, ...]):
+    """
+    Construye una función replace(text, table) que sustituye cada literal de keys
+    en una sola pasada (coincidencia más a la izquierda y más larga)
+    Usa el autómata si pyahocorasick está instalado; si no, la alternancia de regex
+    """
+    if ahocorasick is not None:
+        return _automaton_replacer(keys)
+    return _regex_replacer(keys)
+
+
+@lru_cache(maxsize=8)
+def _load_template_cached(path: str) -> Tuple[str, Dict[bool, Callable[[Any], str]]]:
+    """
+    Lee una plantilla desde disco y genera sus funciones especializadas (sin y con
+    desglose de pagos) una sola vez por proceso
+    Contenido y funciones comparten la misma entrada de caché, así nunca se desincronizan
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    renderers = {
+        has_pagos: ContractTemplate._compile(content, has_pagos, path)
+        for has_pagos in (False, True)
+    }
+    return content, renderers
+
+
+@lru_cache(maxsize=4096)
+def _classify_line(raw_line: str) -> Tuple[str, str]:
+    """
+    Clasifica una línea del contrato y retorna (tipo_de_línea, texto limpio)
+    Las líneas de la plantilla se repiten entre contratos, por eso se cachea
+    """
+    # El texto del título y de CLÁUSULAS no se usa, no hace falta limpiarlo
+    if 'CONTRATO CIVIL DE PRESTACIÓN DE SERVICIOS' in raw_line:
+        return _LINE_TITLE, raw_line
+    if 'CLÁUSULAS' in raw_line:
+        return _LINE_CLAUSULAS, raw_line
+    
+    line = raw_line.strip()
+    first = line[:1]
+    if first.upper() in _CLAUSE_INITIALS and _RE_CLAUSE.match(line):
+        return _LINE_CLAUSE, line
+    if line in _SIGNATURE_LINES:
+        return _LINE_SIGNATURE, line
+    
+    # Despacho por primer carácter: una sola comparación de prefijo por línea
+    prefix_kind = _PREFIX_KIND.get(first)
+    if prefix_kind is not None and line.startswith(prefix_kind[0]):
+        return prefix_kind[1], line
+    if line:
+        return _LINE_BODY, line
+    return _LINE_EMPTY, line
+
+
+def _classify_lines(content: str) -> List[Tuple[str, str]]:
+    """Divide el contenido en tuplas (tipo_de_línea, texto)"""
+    # Solo '\n' separa líneas (el strip del clasificador elimina '\r'); otros
+    # separadores Unicode se mantienen dentro de la línea, como en la plantilla
+    return [_classify_line(line) for line in content.split('\n')]
+
 
 class ContractData:
     """Clase para almacenar y validar datos del contrato"""
     
+    __slots__ = (
+        'contratante_razon_social', 'contratante_nit', 'contratante_representante',
+        'contratante_cc_representante', 'contratante_domicilio', 'contratante_direccion',
+        'contratista_nombre', 'contratista_cc', 'contratista_domicilio', 'contratista_direccion',
+        'objeto_servicios',
+        'valor_total', 'valor_total_letras',
+        'pagos',
+        'banco', 'tipo_cuenta', 'numero_cuenta', 'titular_cuenta', 'cc_titular',
+        'fecha_firma', 'lugar_firma',
+        'retencion_minima', 'penalidad_porcentaje', 'dias_gracia',
+    )
+    
     def __init__(self, data: Dict[str, Any]):
         # Datos del contratante
         self.contratante_razon_social = data.get('contratante_razon_social', '')
@@ -63,19 +271,41 @@ class ContractData:
         
     def validate(self) -> bool:
         """Valida que los datos obligatorios estén presentes"""
-        required_fields = [
-            'contratante_razon_social', 'contratante_nit',
-            'contratista_nombre', 'contratista_cc',
-            'objeto_servicios', 'valor_total'
-        ]
+        # Acceso directo a cada atributo (sin getattr por nombre)
+        required_fields = (
+            ('contratante_razon_social', self.contratante_razon_social),
+            ('contratante_nit', self.contratante_nit),
+            ('contratista_nombre', self.contratista_nombre),
+            ('contratista_cc', self.contratista_cc),
+            ('objeto_servicios', self.objeto_servicios),
+            ('valor_total', self.valor_total),
+        )
         
-        for field in required_fields:
-            if not getattr(self, field):
+        for field, value in required_fields:
+            if not value:
                 raise ValueError(f"Campo obligatorio faltante: {field}")
         
         return True
 
 
+# Resultado fijo para montos en cero (evita llamar a num2words)
+_ZERO_PESOS = "CERO PESOS M/Cte"
+
+
+@lru_cache(maxsize=1024)
+def _convert_cached(number: int) -> str:
+    """Conversión a letras memoizada (num2words es determinista para enteros)"""
+    words = num2words(number, lang='es').upper()
+    return f"{words} PESOS M/Cte"
+
+
+@lru_cache(maxsize=1024)
+def _format_currency_cached(number: int) -> str:
+    """Formato de moneda memoizado con separador de miles en apóstrofo"""
+    num_str = f"{number:,}".replace(',', "'")
+    return f"$ {num_str}"
+
+
 class NumberToSpanish:
     """Convierte números a texto en español (formato colombiano)"""
     
@@ -88,14 +318,11 @@ class NumberToSpanish:
         try:
             # Separar la parte entera de los decimales
             integer_part = int(number)
+            if not integer_part:
+                return _ZERO_PESOS
             
-            # Convertir a palabras en español
-            words = num2words(integer_part, lang='es').upper()
-            
-            # Agregar "PESOS M/CTE" al final
-            result = f"{words} PESOS M/Cte"
-            
-            return result
+            # Convertir a palabras en español y agregar "PESOS M/CTE" al final
+            return _convert_cached(integer_part)
         except Exception as e:
             raise ValueError(f"Error al convertir número a letras: {e}")
     
@@ -105,148 +332,188 @@ class NumberToSpanish:
         Formatea un número como moneda colombiana
         Ejemplo: 7040667 -> $ 7'040.667
         """
-        # Convertir a string y separar por miles con apóstrofo
-        num_str = f"{int(number):,}".replace(',', "'")
-        return f"$ {num_str}"
+        return _format_currency_cached(int(number))
 
 
 class ContractTemplate:
     """Clase para manejar la plantilla del contrato"""
     
+    # Literales de la plantilla de ejemplo y el campo de ContractData que los reemplaza
+    _LITERAL_FIELDS = {
+        # Datos del contratante
+        'Dulces El Trapiche S.A.S': 'contratante_razon_social',
+        '890932227- 3': 'contratante_nit',
+        '890932227-3': 'contratante_nit',
+        'Edison Ramírez Serna Quintero': 'contratante_representante',
+        'Cra 51 # 95A Sur -13': 'contratante_direccion',
+        
+        # Datos del contratista
+        'GERMÁN GARCÍA PÉREZ': 'contratista_nombre',
+        '79155480': 'contratista_cc',
+        '79.155.480': 'contratista_cc',
+        
+        # Banco
+        'Bancolombia': 'banco',
+        '912-381559-89': 'numero_cuenta',
+        'Daniel García Araque': 'titular_cuenta',
+        '1000718485': 'cc_titular',
+    }
+    
+    # Valores calculados (no son atributos directos de ContractData)
+    _DERIVED_EXPRS = {
+        'valor_total_formato': 'NumberToSpanish.format_currency(data.valor_total)',
+        'desglose': 'build_desglose(data.pagos)',
+    }
+    
     def __init__(self, template_path: str):
         self.template_path = template_path
-        self.template_content = self._load_template()
-    
-    def _load_template(self) -> str:
-        """Carga el contenido de la plantilla"""
-        with open(self.template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        
+        # Contenido y funciones especializadas (cacheados por ruta)
+        self.template_content, self._apply = _load_template_cached(template_path)
     
     def replace_placeholders(self, data: ContractData) -> str:
         """Reemplaza todos los marcadores de posición con los datos reales"""
-        content = self.template_content
-        
-        # Reemplazar datos del contratante
-        replacements = {
-            'Dulces El Trapiche S.A.S': data.contratante_razon_social,
-            '890932227- 3': data.contratante_nit,
-            '890932227-3': data.contratante_nit,
-            'Edison Ramírez Serna Quintero': data.contratante_representante,
-            'Cra 51 # 95A Sur -13': data.contratante_direccion,
-            
-            # Datos del contratista
-            'GERMÁN GARCÍA PÉREZ': data.contratista_nombre,
-            '79155480': data.contratista_cc,
-            '79.155.480': data.contratista_cc,
-            
-            # Banco
-            'Bancolombia': data.banco,
-            '912-381559-89': data.numero_cuenta,
-            'Daniel García Araque': data.titular_cuenta,
-            '1000718485': data.cc_titular,
-        }
-        
-        # Realizar reemplazos básicos
-        for old_value, new_value in replacements.items():
-            content = content.replace(old_value, str(new_value))
+        return self._apply[bool(data.pagos)](data)
+    
+    @classmethod
+    def _substitute(cls, content: str, values: Dict[str, str], has_pagos: bool) -> str:
+        """
+        Aplica en orden todos los reemplazos sobre el contenido de una plantilla
+        values asocia cada nombre de campo con el texto a insertar
+        """
+        # Realizar reemplazos básicos en una sola pasada sobre el texto
+        # (el buscador depende solo de las claves y se reutiliza entre contratos)
+        table = {old: values[field] for old, field in cls._LITERAL_FIELDS.items()}
+        content = _literal_replacer(tuple(table))(content, table)
         
         # Reemplazar domicilios (más complejo debido a variaciones en el texto)
-        content = re.sub(
-            r'domicilio principal en el municipio de La Estrella, Antioquia',
-            f'domicilio principal en el municipio de {data.contratante_domicilio}',
+        content = _RE_DOMICILIO_CONTRATANTE.sub(
+            f"domicilio principal en el municipio de {values['contratante_domicilio']}",
             content
         )
         
-        content = re.sub(
-            r'con domicilio en el municipio de\s+Sabaneta',
-            f'con domicilio en el municipio de {data.contratista_domicilio}',
+        content = _RE_DOMICILIO_CONTRATISTA.sub(
+            f"con domicilio en el municipio de {values['contratista_domicilio']}",
             content
         )
         
-        content = re.sub(
-            r'dirección: carera 40 # 71 sur-15',
-            f'dirección: {data.contratista_direccion}',
+        content = _RE_DIRECCION.sub(
+            f"dirección: {values['contratista_direccion']}",
             content
         )
         
         # Reemplazar objeto del contrato
-        content = re.sub(
-            r'prestará los servicios de:.*?Estos servicios',
-            f'prestará los servicios de: {data.objeto_servicios}\nEstos servicios',
+        content = _splice(
             content,
-            flags=re.DOTALL
+            'prestará los servicios de:',
+            'Estos servicios',
+            f"prestará los servicios de: {values['objeto_servicios']}\n",
+            consume_end=False
         )
         
-        # Reemplazar valores monetarios y desglose de pagos
-        content = self._replace_payment_section(content, data)
+        # Reemplazar el valor total
+        honorarios_text = f"la suma de: {values['valor_total_letras']}, {values['valor_total_formato']}"
+        content = _splice(content, 'la suma de: SIETE MILLONES', "$ 7'040.667", honorarios_text)
+        
+        # Reemplazar el desglose completo de pagos
+        if has_pagos:
+            content = _splice(
+                content,
+                'discriminados de la siguiente manera:',
+                'El contratista podrá',
+                values['desglose'],
+                consume_end=False
+            )
         
         # Reemplazar fecha de firma
-        content = re.sub(
-            r'Sabaneta, Antioquia a los siete \(14\) días del mes de enero',
-            f'{data.lugar_firma} a los {data.fecha_firma}',
+        content = _RE_FECHA.sub(
+            f"{values['lugar_firma']} a los {values['fecha_firma']}",
             content
         )
         
         # Reemplazar retención en la fuente
-        content = content.replace('$ 1\'344.573', f'$ {data.retencion_minima}')
+        content = content.replace('$ 1\'344.573', f"$ {values['retencion_minima']}")
         
         # Reemplazar porcentaje de penalidad
-        content = content.replace('20%', f'{data.penalidad_porcentaje}%')
+        content = content.replace('20%', f"{values['penalidad_porcentaje']}%")
         
         # Reemplazar días de gracia
-        content = content.replace('(5) días', f'({data.dias_gracia}) días')
+        content = content.replace('(5) días', f"({values['dias_gracia']}) días")
         
         return content
     
-    def _replace_payment_section(self, content: str, data: ContractData) -> str:
-        """Reemplaza la sección de honorarios con los valores correctos"""
-        
-        # Construir el texto de honorarios
-        honorarios_text = f"la suma de: {data.valor_total_letras}, {NumberToSpanish.format_currency(data.valor_total)}"
-        
-        # Reemplazar el valor total
-        content = re.sub(
-            r'la suma de: SIETE MILLONES.*?\$ 7\'040\.667',
-            honorarios_text,
-            content,
-            flags=re.DOTALL
+    @classmethod
+    def _compile(cls, content: str, has_pagos: bool, template_path: str):
+        """
+        Genera una función especializada para el contenido de una plantilla
+        Los reemplazos se ejecutan una sola vez con marcadores en lugar de datos;
+        el resultado se convierte en código que solo une texto fijo y valores
+        """
+        exprs = {name: f'str(data.{name})' for name in ContractData.__slots__}
+        exprs.update(cls._DERIVED_EXPRS)
+        
+        # Marcador que no aparece en la plantilla (zona de uso privado de Unicode)
+        mark = next(chr(c) for c in range(0xE000, 0xF900) if chr(c) not in content)
+        names = list(exprs)
+        marks = {name: f'{mark}{i}{mark}' for i, name in enumerate(names)}
+        planned = cls._substitute(content, marks, has_pagos)
+        
+        # Las piezas alternan: texto fijo, índice de campo, texto fijo, ...
+        pieces = re.split(rf'{mark}(\d+){mark}', planned)
+        used = sorted({int(index) for index in pieces[1::2]})
+        
+        lines = ['def replace_placeholders(data):']
+        lines.extend(f'    v{i} = {exprs[names[i]]}' for i in used)
+        lines.append('    return \'\'.join((')
+        for n, piece in enumerate(pieces):
+            if n % 2:
+                lines.append(f'        v{piece},')
+            elif piece:
+                lines.append(f'        {piece!r},')
+        lines.append('    ))')
+        
+        namespace = {'NumberToSpanish': NumberToSpanish, 'build_desglose': cls._build_desglose}
+        code = compile('\n'.join(lines), f'<plantilla {template_path}>', 'exec')
+        exec(code, namespace)
+        return namespace['replace_placeholders']
+    
+    @staticmethod
+    def _build_desglose(pagos) -> str:
+        """Construye el texto del desglose de pagos"""
+        parts = [" discriminados de la siguiente manera:\n"]
+        parts.extend(
+            f"• {pago.get('concepto', '')} pagaderos: "
+            f"{NumberToSpanish.convert(pago.get('anticipo', 0))} "
+            f"{NumberToSpanish.format_currency(pago.get('anticipo', 0))} "
+            f"el día {pago.get('fecha_anticipo', '')} y "
+            f"{NumberToSpanish.convert(pago.get('saldo', 0))} "
+            f"{NumberToSpanish.format_currency(pago.get('saldo', 0))} "
+            f"al momento de la entrega.\n"
+            for pago in pagos
         )
-        
-        # Construir el desglose de pagos
-        if data.pagos:
-            desglose = " discriminados de la siguiente manera:\n"
-            for pago in data.pagos:
-                concepto = pago.get('concepto', '')
-                anticipo = pago.get('anticipo', 0)
-                anticipo_letras = NumberToSpanish.convert(anticipo)
-                anticipo_formato = NumberToSpanish.format_currency(anticipo)
-                fecha_anticipo = pago.get('fecha_anticipo', '')
-                
-                saldo = pago.get('saldo', 0)
-                saldo_letras = NumberToSpanish.convert(saldo)
-                saldo_formato = NumberToSpanish.format_currency(saldo)
-                
-                desglose += f"• {concepto} pagaderos: {anticipo_letras} {anticipo_formato} el día {fecha_anticipo} y {saldo_letras} {saldo_formato} al momento de la entrega.\n"
-            
-            # Reemplazar el desglose completo
-            pattern = r'discriminados de la siguiente manera:.*?El contratista podrá'
-            replacement = desglose + "El contratista podrá"
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        return content
+        return ''.join(parts)
 
 
 class PDFGenerator:
     """Genera el PDF del contrato con formato profesional"""
     
-    def __init__(self, output_path: str):
+    # Hoja de estilos compartida entre instancias (se construye en el primer uso)
+    _styles = None
+    
+    def __init__(self, output_path: Optional[str] = None):
         self.output_path = output_path
-        self.styles = self._create_styles()
+        self.styles = self._styles_sheet()
+    
+    @classmethod
+    def _styles_sheet(cls):
+        """Retorna la hoja de estilos compartida, creándola si aún no existe"""
+        if cls._styles is None:
+            cls._styles = cls._build_styles()
+        return cls._styles
     
-    def _create_styles(self):
+    @staticmethod
+    def _build_styles():
         """Crea los estilos para el documento PDF - Diseño profesional limpio"""
-        from reportlab.lib import colors
-        
         styles = getSampleStyleSheet()
         
         # Título principal - Elegante y profesional
@@ -315,13 +582,20 @@ class PDFGenerator:
         return styles
     
     def generate(self, contract_content: str, contract_data: ContractData):
-        """Genera el PDF del contrato con formato limpio y profesional"""
-        from reportlab.lib import colors
-        from reportlab.platypus import Table, TableStyle
+        """Genera el PDF del contrato y lo escribe en output_path en una sola operación"""
+        if self.output_path is None:
+            raise ValueError("PDFGenerator no tiene output_path; use generate_to_bytes para generar el PDF en memoria")
         
-        # Configuración del documento
+        pdf_bytes = self.generate_to_bytes(contract_content, contract_data)
+        with open(self.output_path, 'wb') as f:
+            f.write(pdf_bytes)
+    
+    def generate_to_bytes(self, contract_content: str, contract_data: ContractData) -> bytes:
+        """Genera el PDF del contrato en memoria con formato limpio y profesional"""
+        # Configuración del documento (se construye en memoria)
+        buf = io.BytesIO()
         doc = SimpleDocTemplate(
-            self.output_path,
+            buf,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
@@ -330,137 +604,81 @@ class PDFGenerator:
         )
         
         story = []
+        story_append = story.append
+        
+        # Estilos usados en el recorrido de líneas
+        body_style = self.styles['ContractBody']
+        clause_style = self.styles['ClauseTitle']
+        para_style = self.styles['SpecialParagraph']
+        sub_style = self.styles['ContractSubtitle']
         
         # === TÍTULO ===
         title = Paragraph("CONTRATO CIVIL DE PRESTACIÓN DE SERVICIOS", self.styles['ContractTitle'])
-        story.append(title)
-        story.append(Spacer(1, 0.3 * inch))
+        story_append(title)
+        story_append(Spacer(1, 0.3 * inch))
         
         # === PROCESAR CONTENIDO ===
-        # Limpiar y dividir contenido
-        lines = [line.strip() for line in contract_content.split('\n')]
-        
-        i = 0
+        # Recorrer las líneas clasificadas en una sola pasada
         clausulas_shown = False
+        body_buf = []
         
-        while i < len(lines):
-            line = lines[i]
-            
-            # Saltar título (ya mostrado)
-            if 'CONTRATO CIVIL DE PRESTACIÓN DE SERVICIOS' in line:
-                i += 1
+        def flush_body():
+            # Crear párrafo con las líneas acumuladas
+            if body_buf:
+                full_text = ' '.join(body_buf)
+                if len(full_text) > 5:  # Evitar párrafos muy cortos
+                    story_append(Paragraph(full_text, body_style))
+                body_buf.clear()
+        
+        for kind, line in _classify_lines(contract_content):
+            # Construir párrafos: acumular líneas hasta que termine el bloque
+            if kind == _LINE_BODY:
+                body_buf.append(line)
                 continue
             
+            flush_body()
+            
             # Mostrar CLÁUSULAS una sola vez
-            if 'CLÁUSULAS' in line and not clausulas_shown:
-                story.append(Spacer(1, 0.2 * inch))
-                clausulas_para = Paragraph("CLÁUSULAS", self.styles['ContractSubtitle'])
-                story.append(clausulas_para)
-                story.append(Spacer(1, 0.15 * inch))
+            if kind == _LINE_CLAUSULAS and not clausulas_shown:
+                story_append(Spacer(1, 0.2 * inch))
+                clausulas_para = Paragraph("CLÁUSULAS", sub_style)
+                story_append(clausulas_para)
+                story_append(Spacer(1, 0.15 * inch))
                 clausulas_shown = True
-                i += 1
-                continue
-            elif 'CLÁUSULAS' in line:
-                i += 1
-                continue
             
             # Detectar cláusulas (PRIMERA, SEGUNDA, etc.)
-            if re.match(r'^(PRIMERA|SEGUNDA|TERCERA|CUARTA|QUINTA|SEXTA|SÉPTIMA|OCTAVA|NOVENA|DECIMA|DÉCIMA)', line, re.IGNORECASE):
-                clause_para = Paragraph(line, self.styles['ClauseTitle'])
-                story.append(clause_para)
-                i += 1
-                continue
+            elif kind == _LINE_CLAUSE:
+                clause_para = Paragraph(line, clause_style)
+                story_append(clause_para)
             
             # Detectar PARÁGRAFO
-            if line.startswith('PARÁGRAFO'):
-                para_para = Paragraph(line, self.styles['SpecialParagraph'])
-                story.append(para_para)
-                i += 1
-                continue
-            
-            # Saltar líneas de firma
-            if line in ['EL CONTRATANTE', 'EL CONTRATISTA', '.'] or line.startswith('EDISÓN') or line.startswith('GERMÁN') or line.startswith('CC '):
-                i += 1
-                continue
+            elif kind == _LINE_PARAGRAFO:
+                para_para = Paragraph(line, para_style)
+                story_append(para_para)
             
-            # Construir párrafos
-            if line:
-                paragraph_text = [line]
-                i += 1
-                
-                # Continuar agregando líneas al mismo párrafo
-                while i < len(lines):
-                    next_line = lines[i]
-                    
-                    # Detener si es línea vacía, cláusula, o palabra clave
-                    if (not next_line or 
-                        'CLÁUSULAS' in next_line or
-                        re.match(r'^(PRIMERA|SEGUNDA|TERCERA|CUARTA|QUINTA|SEXTA|SÉPTIMA|OCTAVA|NOVENA|DECIMA|DÉCIMA)', next_line, re.IGNORECASE) or
-                        next_line.startswith('PARÁGRAFO') or
-                        next_line in ['EL CONTRATANTE', 'EL CONTRATISTA', '.'] or
-                        next_line.startswith('EDISÓN') or next_line.startswith('GERMÁN') or next_line.startswith('CC ')):
-                        break
-                    
-                    paragraph_text.append(next_line)
-                    i += 1
-                
-                # Crear párrafo
-                full_text = ' '.join(paragraph_text)
-                if len(full_text) > 5:  # Evitar párrafos muy cortos
-                    para = Paragraph(full_text, self.styles['ContractBody'])
-                    story.append(para)
-            else:
-                i += 1
+            # Título (ya mostrado), CLÁUSULAS repetido, firmas y líneas vacías se omiten
+        
+        flush_body()
         
         # === FIRMAS ===
         story.append(Spacer(1, 0.5 * inch))
         
         # Tabla de firmas con líneas profesionales
+        # (la línea de firma la dibuja LINEABOVE sobre la fila de nombres)
         firma_data = [
             ['', ''],
-            ['_' * 50, '_' * 50],
-            
             [contract_data.contratante_representante.upper(), contract_data.contratista_nombre.upper()],
             [f'CC: {contract_data.contratante_cc_representante}', f'CC: {contract_data.contratista_cc}']
         ]
         
         firma_table = Table(firma_data, colWidths=[3.25*inch, 3.25*inch])
-        firma_table.setStyle(TableStyle([
-            # Líneas de firma reales
-            ('LINEABOVE', (0, 1), (0, 1), 1.5, colors.black),
-            ('LINEABOVE', (1, 1), (1, 1), 1.5, colors.black),
-            
-            # Alineación
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            
-            # Fuentes - Títulos
-            ('FONTNAME', (0, 2), (-1, 2), 'Helvetica'),
-            ('FONTSIZE', (0, 2), (-1, 2), 9),
-            ('TEXTCOLOR', (0, 2), (-1, 2), colors.black),
-            
-            # Fuentes - Nombres
-            ('FONTNAME', (0, 3), (-1, 3), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 3), (-1, 3), 10),
-            ('TEXTCOLOR', (0, 3), (-1, 3), colors.black),
-            
-            # Fuentes - CC
-            ('FONTNAME', (0, 4), (-1, 4), 'Helvetica'),
-            ('FONTSIZE', (0, 4), (-1, 4), 9),
-            ('TEXTCOLOR', (0, 4), (-1, 4), colors.black),
-            
-            # Espaciado
-            ('TOPPADDING', (0, 0), (-1, 0), 8),
-            ('TOPPADDING', (0, 1), (-1, 1), 0),
-            ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
-            ('TOPPADDING', (0, 2), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 2), (-1, -1), 4),
-        ]))
+        firma_table.setStyle(_FIRMA_TABLE_STYLE)
         
         story.append(firma_table)
         
         # Construir PDF
         doc.build(story)
+        return buf.getvalue()
 
 
 class ContractGeneratorBackend:
@@ -482,18 +700,7 @@ class ContractGeneratorBackend:
             Ruta del archivo PDF generado
         """
         try:
-            # Crear objeto de datos del contrato
-            contract_data = ContractData(data)
-            
-            # Validar datos
-            contract_data.validate()
-            
-            # Convertir valores monetarios a letras si no están proporcionados
-            if not contract_data.valor_total_letras:
-                contract_data.valor_total_letras = NumberToSpanish.convert(contract_data.valor_total)
-            
-            # Reemplazar placeholders en la plantilla
-            contract_content = self.template.replace_placeholders(contract_data)
+            contract_content, contract_data = self._prepare_contract(data)
             
             # Generar PDF
             pdf_generator = PDFGenerator(output_path)
@@ -504,6 +711,65 @@ class ContractGeneratorBackend:
         except Exception as e:
             raise Exception(f"Error al generar el contrato: {str(e)}")
     
+    def generate_contract_bytes(self, data: Dict[str, Any]) -> bytes:
+        """
+        Genera un contrato PDF en memoria, sin escribir en disco
+        
+        Args:
+            data: Diccionario con los datos del contrato
+        
+        Returns:
+            Contenido del PDF generado
+        """
+        try:
+            contract_content, contract_data = self._prepare_contract(data)
+            return PDFGenerator().generate_to_bytes(contract_content, contract_data)
+            
+        except Exception as e:
+            raise Exception(f"Error al generar el contrato: {str(e)}")
+    
+    def _prepare_contract(self, data: Dict[str, Any]) -> Tuple[str, ContractData]:
+        """Valida los datos y retorna el contenido del contrato ya reemplazado"""
+        # Crear objeto de datos del contrato
+        contract_data = ContractData(data)
+        
+        # Validar datos
+        contract_data.validate()
+        
+        # Convertir valores monetarios a letras si no están proporcionados
+        if not contract_data.valor_total_letras:
+            contract_data.valor_total_letras = NumberToSpanish.convert(contract_data.valor_total)
+        
+        # Reemplazar placeholders en la plantilla
+        contract_content = self.template.replace_placeholders(contract_data)
+        
+        return contract_content, contract_data
+    
+    def generate_contracts_batch(self, items: Iterable[Tuple[Dict[str, Any], str]],
+                                 n_workers: Optional[int] = None) -> List[str]:
+        """
+        Genera varios contratos PDF en paralelo, uno por proceso de trabajo
+        
+        Args:
+            items: Pares (datos del contrato, ruta de salida del PDF)
+            n_workers: Número de procesos (por defecto, los núcleos disponibles)
+        
+        Returns:
+            Rutas de los PDF generados, en el mismo orden de items
+        """
+        items = list(items)
+        if not items:
+            return []
+        datas, output_paths = zip(*items)
+        
+        # Cada proceso crea un único backend (plantilla y funciones generadas) al iniciar
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_batch_worker,
+            initargs=(self.template_path,)
+        ) as executor:
+            return list(executor.map(_generate_in_worker, datas, output_paths))
+    
     def validate_contract_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Valida los datos del contrato y retorna información sobre errores
@@ -530,6 +796,21 @@ class ContractGeneratorBackend:
             }
 
 
+# Backend del proceso de trabajo en generate_contracts_batch
+_worker_backend = None
+
+
+def _init_batch_worker(template_path: str):
+    """Crea el backend del proceso de trabajo una sola vez"""
+    global _worker_backend
+    _worker_backend = ContractGeneratorBackend(template_path)
+
+
+def _generate_in_worker(data: Dict[str, Any], output_path: str) -> str:
+    """Genera un contrato con el backend del proceso de trabajo"""
+    return _worker_backend.generate_contract(data, output_path)
+
+
 # Funciones auxiliares para uso directo
 
 def generate_contract_from_dict(data: Dict[str, Any], template_path: str, output_path: str) -> str:
@@ -7,10 +7,9 @@ from pypdf import PdfReader
 def extract_pdf_text(pdf_path):
     """Extrae todo el texto de un PDF"""
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        reader = PdfReader(pdf_path, strict=False)
+        # Páginas escaneadas pueden no tener texto (extract_text retorna None)
+        text = "\n".join(page.extract_text() or "" for page in reader.pages) + "\n"
         return text
     except Exception as e:
         print(f"Error: {e}")
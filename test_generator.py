@@ -2,7 +2,9 @@
 Script de prueba para el generador de contratos
 """
 
+import json
 import os
+import tempfile
 from contract_generator import ContractGeneratorBackend, generate_contract_from_json
 
 def test_basic_generation():
@@ -97,6 +99,134 @@ def test_number_conversion():
         print(f"{formatted:>20} -> {text}")
 
 
+def test_literal_replacers_match():
+    """Prueba que el autómata y la regex producen los mismos reemplazos literales"""
+    
+    import contract_generator
+    from contract_generator import _regex_replacer, _automaton_replacer
+    
+    print("\n🔤 Probando reemplazos literales...")
+    print("-" * 50)
+    
+    cases = [
+        (('Sabaneta', 'La Sabaneta Norte'), 'Vive en La Sabaneta No'),
+        (('Sabaneta', 'La Sabaneta Norte'), 'La Sabaneta Norte y Sabaneta'),
+        (('ab', 'abc', 'bcd', 'x'), 'abcd xabcbcd ab'),
+        (('890932227- 3', '890932227-3'), 'NIT 890932227-3 y 890932227- 3'),
+    ]
+    
+    for keys, text in cases:
+        table = {key: f'<{key}>' for key in keys}
+        expected = _regex_replacer(keys)(text, table)
+        
+        if contract_generator.ahocorasick is not None:
+            assert _automaton_replacer(keys)(text, table) == expected, (keys, text)
+    
+    assert _regex_replacer(cases[0][0])(cases[0][1], {'Sabaneta': 'X', 'La Sabaneta Norte': 'Y'}) == 'Vive en La X No'
+    
+    if contract_generator.ahocorasick is None:
+        print("⚠️  pyahocorasick no instalado: solo se probó la regex")
+    else:
+        print("✅ El autómata y la regex coinciden")
+
+
+def test_compiled_template():
+    """Prueba que la plantilla compilada equivale a aplicar los reemplazos directamente"""
+    
+    from contract_generator import ContractTemplate, ContractData, NumberToSpanish
+    
+    print("\n⚙️  Probando plantilla compilada...")
+    print("-" * 50)
+    
+    with open("datos/example_data.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    template = ContractTemplate("templates/contrato_ejemplo.txt")
+    
+    for variant in (data, dict(data, pagos=[])):
+        contract_data = ContractData(variant)
+        values = {name: str(getattr(contract_data, name)) for name in ContractData.__slots__}
+        values['valor_total_formato'] = NumberToSpanish.format_currency(contract_data.valor_total)
+        values['desglose'] = ContractTemplate._build_desglose(contract_data.pagos)
+        
+        expected = template._substitute(template.template_content, values, bool(contract_data.pagos))
+        assert template.replace_placeholders(contract_data) == expected
+    
+    # Las funciones generadas se reutilizan entre instancias de la misma plantilla
+    assert ContractTemplate("templates/contrato_ejemplo.txt")._apply is template._apply
+    
+    print("✅ La plantilla compilada coincide con y sin pagos")
+
+
+def test_rendering_matches_reference():
+    """Prueba que el contenido generado coincide con la salida de referencia conocida"""
+    
+    print("\n📑 Probando contenido contra la referencia...")
+    print("-" * 50)
+    
+    with open("datos/example_data.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    backend = ContractGeneratorBackend("templates/contrato_ejemplo.txt")
+    
+    # Referencias generadas con la implementación original (reemplazos secuenciales)
+    references = (
+        (data, "datos/example_rendered.txt"),
+        (dict(data, pagos=[]), "datos/example_rendered_sin_pagos.txt"),
+    )
+    for variant, reference_path in references:
+        with open(reference_path, 'r', encoding='utf-8') as f:
+            expected = f.read()
+        content, _ = backend._prepare_contract(variant)
+        assert content == expected, reference_path
+    
+    # Los datos del usuario ya no se vuelven a procesar: un '20%' en el objeto se conserva
+    variant = dict(data, objeto_servicios="Descuento del 20% en mantenimiento", penalidad_porcentaje="30")
+    content, _ = backend._prepare_contract(variant)
+    assert "Descuento del 20% en mantenimiento" in content
+    assert "penalidad del 30%" in content
+    
+    print("✅ El contenido coincide con la referencia, con y sin pagos")
+
+
+def test_bytes_generation():
+    """Prueba de generación de contrato en memoria"""
+    
+    print("\n🧠 Probando generación en memoria...")
+    print("-" * 50)
+    
+    with open("datos/example_data.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    backend = ContractGeneratorBackend("templates/contrato_ejemplo.txt")
+    pdf_bytes = backend.generate_contract_bytes(data)
+    
+    assert pdf_bytes.startswith(b'%PDF')
+    print(f"✅ PDF generado en memoria: {len(pdf_bytes):,} bytes")
+
+
+def test_batch_generation():
+    """Prueba de generación de varios contratos en paralelo"""
+    
+    print("\n📚 Probando generación por lotes...")
+    print("-" * 50)
+    
+    with open("datos/example_data.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    backend = ContractGeneratorBackend("templates/contrato_ejemplo.txt")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        items = [(data, os.path.join(tmp_dir, f"contrato_{n}.pdf")) for n in range(3)]
+        results = backend.generate_contracts_batch(items, n_workers=2)
+        
+        assert results == [path for _, path in items]
+        for path in results:
+            assert os.path.getsize(path) > 0
+    
+    print(f"✅ {len(results)} contratos generados en paralelo")
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("GENERADOR DE CONTRATOS - SUITE DE PRUEBAS")
@@ -104,8 +234,13 @@ if __name__ == "__main__":
     
     # Ejecutar pruebas
     test_number_conversion()
+    test_literal_replacers_match()
+    test_compiled_template()
+    test_rendering_matches_reference()
     test_validation()
     test_basic_generation()
+    test_bytes_generation()
+    test_batch_generation()
     
     print("\n" + "=" * 50)
     print("✅ Todas las pruebas completadas")